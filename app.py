@@ -1,14 +1,28 @@
+import collections
+import itertools
+import math
+import mimetypes
 import os
+import queue
+import re
+import tempfile
 import traceback
 import uuid
 import threading
-from difflib import SequenceMatcher
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from urllib.parse import quote
 
 import cv2
 import numpy as np
 import pytesseract
+from rapidfuzz import fuzz
 from flask import (
+    Blueprint,
     Flask,
+    Request,
+    abort,
+    current_app,
     redirect,
     render_template,
     request,
@@ -16,37 +30,180 @@ from flask import (
     send_from_directory,
     url_for,
 )
+from werkzeug.security import safe_join
 
-app = Flask(__name__)
-app.config["UPLOAD_FOLDER"] = "uploads"
-app.config["MAX_CONTENT_LENGTH"] = 1024 * 1024 * 1024  # 1GB
+try:
+    from tesserocr import OEM, PSM, PyTessBaseAPI
+except ImportError:
+    PyTessBaseAPI = None
 
-JOBS = {}
-JOBS_LOCK = threading.Lock()
-THUMB_TIMESTAMPS = [0, 5, 10, 20, 30, 40]
-OCR_INTERVAL_SECONDS = 2
-OCR_MAX_SECONDS_DEFAULT = 60
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
+try:
+    _CUDA_ENABLED = cv2.cuda.getCudaEnabledDeviceCount() > 0
+except (AttributeError, cv2.error):
+    _CUDA_ENABLED = False
 
-def _preprocess_subtitle_roi(roi_img):
-    hsv = cv2.cvtColor(roi_img, cv2.COLOR_BGR2HSV)
 
-    v_channel = hsv[:, :, 2]
-    bright_mask = cv2.inRange(v_channel, 180, 255)
+class _UploadRequest(Request):
+    # 업로드 파일을 공개되지 않는 수신 폴더에 받아 두고, 저장할 때는 복사 대신 이름만 바꾼다.
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        incoming_folder = current_app.config["INCOMING_FOLDER"]
+        os.makedirs(incoming_folder, exist_ok=True)
+        stream = tempfile.NamedTemporaryFile(
+            prefix="upload_", suffix=".part", dir=incoming_folder, delete=False
+        )
+        self.__dict__.setdefault("_upload_paths", []).append(stream.name)
+        return stream
 
-    white_mask = cv2.inRange(hsv, (0, 0, 170), (180, 65, 255))
-    yellow_mask = cv2.inRange(hsv, (15, 45, 120), (40, 255, 255))
+    def close(self):
+        super().close()
+        for path in self.__dict__.get("_upload_paths", ()):
+            if os.path.exists(path):
+                os.remove(path)
 
-    color_mask = cv2.bitwise_or(white_mask, yellow_mask)
-    subtitle_mask = cv2.bitwise_and(color_mask, bright_mask)
 
-    binary = cv2.morphologyEx(
+bp = Blueprint("main", __name__)
+
+JOBS = {}
+_preprocess_local = threading.local()
+THUMB_TIMESTAMPS = [0, 5, 10, 20, 30, 40]
+THUMB_ENCODE_WORKERS = 4
+THUMB_GRAB_MAX_SECONDS = 6
+THUMB_WIDTH = 320
+OCR_INTERVAL_SECONDS = 2
+OCR_MAX_SECONDS_DEFAULT = 60
+OCR_BATCH_SIZE = 20
+OCR_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+OCR_READ_QUEUE_SIZE = 4
+OCR_CANCEL_POLL_SECONDS = 0.2
+PREPROCESS_WORKERS = os.cpu_count() or 1
+OCR_TARGET_TEXT_HEIGHT = 32
+OCR_SCALE_TOLERANCE = (0.9, 1.5)
+OCR_MAX_UPSCALE = 3.0
+OCR_SAME_MASK_TOLERANCE = 0.05
+DEDUPE_SIMILARITY_THRESHOLD = 0.88
+CHAR_RATIO_NUMPY_MIN_LEN = 16
+
+_WHITESPACE_CODEPOINTS = np.array([cp for cp in range(0x3001) if chr(cp).isspace()], dtype=np.uint32)
+_WS_RE = re.compile(r"\s{2,}|[^\S ]")
+_THUMB_JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 70]
+_DEBUG_JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 60]
+_OCR_PAGE_PNG_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+_MORPH_KERNEL_5 = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+
+
+@dataclass(slots=True)
+class Job:
+    video_path: str
+    thumbnails: list
+    fps: float = 0
+    total_frames: float = 0
+    duration: float = 0
+    status: str = "uploaded"
+    selected_timestamp: float | None = None
+    selected_frame: str | None = None
+    roi: dict | None = None
+    limit_to_60: bool = True
+    psm_mode: int = 6
+    korean_only: bool = False
+    include_english: bool = False
+    progress_current: int = 0
+    progress_total: int = 0
+    result_text: str = ""
+    result_file: str | None = None
+    raw_line_count: int = 0
+    cleaned_line_count: int = 0
+    error: str = ""
+    debug_preprocessed_roi_before: str | None = None
+    debug_preprocessed_roi_after: str | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+
+class _OcrCancelled(Exception):
+    pass
+
+
+if njit is not None:
+
+    @njit(fastmath=True, cache=True, nogil=True)
+    def _hsv_subtitle_mask(hsv, out):
+        for y in range(hsv.shape[0]):
+            for x in range(hsv.shape[1]):
+                h = hsv[y, x, 0]
+                s = hsv[y, x, 1]
+                v = hsv[y, x, 2]
+                keep = (v >= 180) & ((s <= 65) | ((h >= 15) & (h <= 40) & (s >= 45)))
+                out[y, x] = 255 if keep else 0
+
+    _hsv_subtitle_mask(np.zeros((1, 1, 3), dtype=np.uint8), np.zeros((1, 1), dtype=np.uint8))
+else:
+    _hsv_subtitle_mask = None
+
+
+def _scratch_buffer(scratch, name: str, shape):
+    if scratch is None:
+        return np.empty(shape, dtype=np.uint8)
+    buf = scratch.get(name)
+    if buf is None or buf.shape != shape:
+        buf = np.empty(shape, dtype=np.uint8)
+        scratch[name] = buf
+    return buf
+
+
+def _closed_subtitle_mask(roi_img, scratch):
+    hsv = cv2.cvtColor(
+        roi_img, cv2.COLOR_BGR2HSV, dst=_scratch_buffer(scratch, "hsv", roi_img.shape)
+    )
+    mask_shape = hsv.shape[:2]
+
+    # (흰색 | 노란색) & 밝기(V >= 180)를 V 하한에 미리 합쳐 계산한다.
+    subtitle_mask = _scratch_buffer(scratch, "white", mask_shape)
+    if _hsv_subtitle_mask is not None:
+        _hsv_subtitle_mask(hsv, subtitle_mask)
+    else:
+        cv2.inRange(hsv, (0, 0, 180), (180, 65, 255), dst=subtitle_mask)
+        yellow_mask = cv2.inRange(
+            hsv, (15, 45, 180), (40, 255, 255), dst=_scratch_buffer(scratch, "yellow", mask_shape)
+        )
+        cv2.bitwise_or(subtitle_mask, yellow_mask, dst=subtitle_mask)
+
+    return cv2.morphologyEx(
         subtitle_mask,
         cv2.MORPH_CLOSE,
-        cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3)),
-        iterations=2,
+        _MORPH_KERNEL_5,
+        dst=_scratch_buffer(scratch, "binary", subtitle_mask.shape),
     )
 
+
+def _closed_subtitle_mask_cuda(roi_img, scratch):
+    if scratch is None:
+        scratch = {}
+    close_filter = scratch.get("cuda_close_filter")
+    if close_filter is None:
+        close_filter = cv2.cuda.createMorphologyFilter(cv2.MORPH_CLOSE, cv2.CV_8UC1, _MORPH_KERNEL_5)
+        scratch["cuda_close_filter"] = close_filter
+
+    gpu_roi = cv2.cuda_GpuMat()
+    gpu_roi.upload(np.ascontiguousarray(roi_img))
+    gpu_hsv = cv2.cuda.cvtColor(gpu_roi, cv2.COLOR_BGR2HSV)
+    gpu_mask = cv2.cuda.bitwise_or(
+        cv2.cuda.inRange(gpu_hsv, (0, 0, 180), (180, 65, 255)),
+        cv2.cuda.inRange(gpu_hsv, (15, 45, 180), (40, 255, 255)),
+    )
+    return close_filter.apply(gpu_mask).download()
+
+
+def _preprocess_subtitle_roi(roi_img, scratch=None):
+    if _CUDA_ENABLED:
+        binary = _closed_subtitle_mask_cuda(roi_img, scratch)
+    else:
+        binary = _closed_subtitle_mask(roi_img, scratch)
+
     roi_h, roi_w = binary.shape[:2]
     roi_area = max(roi_h * roi_w, 1)
 
@@ -57,57 +214,158 @@ def _preprocess_subtitle_roi(roi_img):
     min_box_w = 2
     max_box_w = max(min_box_w + 1, int(roi_w * 0.65))
 
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
     filtered_mask = np.zeros_like(binary)
+    box_x, box_y, box_w, box_h = cv2.boundingRect(binary)
+    if box_w == 0 or box_h == 0:
+        return binary, filtered_mask
+    text_band = binary[box_y : box_y + box_h, box_x : box_x + box_w]
+
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(text_band, connectivity=8)
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    aspect_ratios = widths / np.maximum(heights, 1)
+    fill_ratios = areas / np.maximum(widths * heights, 1)
+
+    keep = (
+        (areas >= min_area)
+        & (areas <= max_area)
+        & (widths >= min_box_w)
+        & (widths <= max_box_w)
+        & (heights >= min_box_h)
+        & (heights <= max_box_h)
+        & (aspect_ratios <= 14)
+        & (aspect_ratios >= 0.06)
+        & (fill_ratios >= 0.08)
+        & (fill_ratios <= 0.95)
+    )
+    lut = np.zeros(num_labels, dtype=np.uint8)
+    lut[1:][keep] = 255
+    filtered_mask[box_y : box_y + box_h, box_x : box_x + box_w] = lut[labels]
 
-    for component in range(1, num_labels):
-        width = stats[component, cv2.CC_STAT_WIDTH]
-        height = stats[component, cv2.CC_STAT_HEIGHT]
-        area = stats[component, cv2.CC_STAT_AREA]
+    return binary, filtered_mask
 
-        if area < min_area or area > max_area:
-            continue
-        if width < min_box_w or width > max_box_w:
-            continue
-        if height < min_box_h or height > max_box_h:
-            continue
 
-        aspect_ratio = width / max(height, 1)
-        fill_ratio = area / max(width * height, 1)
-        if aspect_ratio > 14 or aspect_ratio < 0.06:
-            continue
-        if fill_ratio < 0.08 or fill_ratio > 0.95:
-            continue
+def _open_video(video_path: str):
+    return cv2.VideoCapture(
+        video_path,
+        cv2.CAP_FFMPEG,
+        [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+    )
 
-        filtered_mask[labels == component] = 255
 
-    return binary, filtered_mask
+def _preprocess_sample(roi_img, keep_binary: bool):
+    scratch = getattr(_preprocess_local, "scratch", None)
+    if scratch is None:
+        scratch = _preprocess_local.scratch = {}
+    binary, proc = _preprocess_subtitle_roi(roi_img, scratch)
+    return (binary.copy() if keep_binary else None), proc
+
+
+def _scale_for_ocr(proc):
+    rows = np.flatnonzero(proc.any(axis=1))
+    if rows.size == 0:
+        return proc
+    breaks = np.flatnonzero(np.diff(rows) > 1)
+    run_starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    run_ends = np.concatenate((rows[breaks], [rows[-1]]))
+    text_height = int((run_ends - run_starts + 1).max())
+
+    scale = OCR_TARGET_TEXT_HEIGHT / text_height
+    if OCR_SCALE_TOLERANCE[0] <= scale <= OCR_SCALE_TOLERANCE[1]:
+        return proc
+    scale = min(scale, OCR_MAX_UPSCALE)
+    roi_h, roi_w = proc.shape[:2]
+    size = (max(1, round(roi_w * scale)), max(1, round(roi_h * scale)))
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(proc, size, interpolation=interpolation)
+
+
+def _is_same_mask(proc, prev_proc):
+    if prev_proc is None or proc.shape != prev_proc.shape:
+        return False
+    ink = max(np.count_nonzero(proc), np.count_nonzero(prev_proc), 1)
+    changed = np.count_nonzero(cv2.absdiff(proc, prev_proc) > 127)
+    return changed <= ink * OCR_SAME_MASK_TOLERANCE
 
 
 def _extract_frame(video_path: str, timestamp_sec: float):
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        return None
-    cap.set(cv2.CAP_PROP_POS_MSEC, max(0, timestamp_sec * 1000))
-    ok, frame = cap.read()
-    cap.release()
-    return frame if ok else None
+    cap = _open_video(video_path)
+    try:
+        if not cap.isOpened():
+            return None
+        cap.set(cv2.CAP_PROP_POS_MSEC, max(0, timestamp_sec * 1000))
+        ok, frame = cap.read()
+        return frame if ok else None
+    finally:
+        cap.release()
 
 
-def _video_duration(video_path: str):
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        return 0
-    fps = cap.get(cv2.CAP_PROP_FPS) or 0
-    total_frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
-    cap.release()
-    if fps <= 0:
-        return 0
-    return total_frames / fps
+def _iter_sample_frames(cap, fps, interval_seconds, max_seconds=None):
+    if fps > 0:
+        last_frame = round(max_seconds * fps) if max_seconds is not None else None
+    else:
+        last_frame = 0
+
+    # 고정 간격 대신 샘플마다 목표 프레임을 다시 계산해 29.97fps 같은 비정수 fps에서도 어긋나지 않게 한다.
+    sample = 0
+    target_frame = 0
+    for frame_idx in itertools.count():
+        if last_frame is not None and frame_idx > last_frame:
+            return
+        if not cap.grab():
+            return
+        if frame_idx < target_frame:
+            continue
+        ok, frame = cap.retrieve()
+        yield sample + 1, sample * interval_seconds, frame if ok else None
+        sample += 1
+        target_frame = round(sample * interval_seconds * fps)
+
+
+def _put_until_stopped(out_q, item, stop_event):
+    while not stop_event.is_set():
+        try:
+            out_q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
 
 
-def _build_thumbnail_list(job_id: str, video_path: str):
-    duration = _video_duration(video_path)
+def _read_sample_rois(job_id: str, cap, fps, max_seconds, roi, out_q, stop_event):
+    x, y, w, h = roi["x"], roi["y"], roi["w"], roi["h"]
+    try:
+        for idx, sec, frame in _iter_sample_frames(cap, fps, OCR_INTERVAL_SECONDS, max_seconds):
+            roi_img = None
+            if frame is None:
+                print(f"[OCR][{job_id}] frame read failed at {sec}s")
+            else:
+                h_frame, w_frame = frame.shape[:2]
+                x2, y2 = min(x + w, w_frame), min(y + h, h_frame)
+                x1, y1 = max(0, x), max(0, y)
+                if x2 <= x1 or y2 <= y1:
+                    print(f"[OCR][{job_id}] invalid ROI bounds at frame {idx}")
+                else:
+                    roi_img = frame[y1:y2, x1:x2]
+            if not _put_until_stopped(out_q, (idx, sec, roi_img), stop_event):
+                return
+    except Exception as exc:
+        _put_until_stopped(out_q, exc, stop_event)
+    finally:
+        _put_until_stopped(out_q, None, stop_event)
+
+
+def _encode_thumbnail(frame):
+    frame_h, frame_w = frame.shape[:2]
+    if frame_w > THUMB_WIDTH:
+        size = (THUMB_WIDTH, max(1, round(frame_h * THUMB_WIDTH / frame_w)))
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", frame, _THUMB_JPEG_PARAMS)
+    return buf.tobytes() if ok else None
+
+
+def _build_thumbnail_list(cap, fps: float, duration: float):
     timestamps = [t for t in THUMB_TIMESTAMPS if t <= duration]
     if not timestamps:
         timestamps = [0]
@@ -120,19 +378,34 @@ def _build_thumbnail_list(job_id: str, video_path: str):
     timestamps = sorted(timestamps)[:6]
 
     thumbs = []
-    for idx, ts in enumerate(timestamps):
-        frame = _extract_frame(video_path, ts)
-        if frame is None:
-            continue
-        thumb_name = f"thumb_{idx}_{int(ts)}.jpg"
-        thumb_path = os.path.join(app.config["UPLOAD_FOLDER"], job_id, thumb_name)
-        cv2.imwrite(thumb_path, frame)
-        thumbs.append({"timestamp": ts, "path": f"uploads/{job_id}/{thumb_name}"})
+    if not cap.isOpened():
+        return thumbs
+    next_frame = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    with ThreadPoolExecutor(max_workers=THUMB_ENCODE_WORKERS) as executor:
+        encodes = []
+        for idx, ts in enumerate(timestamps):
+            # 가까운 지점은 순차 grab이 키프레임 seek보다 빠르다.
+            gap = round(ts * fps) - next_frame
+            if fps > 0 and 0 <= gap <= fps * THUMB_GRAB_MAX_SECONDS:
+                for _ in range(gap):
+                    if not cap.grab():
+                        break
+            else:
+                cap.set(cv2.CAP_PROP_POS_MSEC, max(0, ts * 1000))
+            ok, frame = cap.read()
+            if not ok:
+                continue
+            next_frame = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            encodes.append((ts, executor.submit(_encode_thumbnail, frame)))
+        for ts, encode in encodes:
+            jpeg = encode.result()
+            if jpeg is not None:
+                thumbs.append({"timestamp": ts, "jpeg": jpeg})
     return thumbs
 
 
 def _normalize_text(text: str):
-    return " ".join(text.strip().split())
+    return _WS_RE.sub(" ", text.strip())
 
 
 def _line_char_ratios(line: str):
@@ -140,9 +413,24 @@ def _line_char_ratios(line: str):
     if total == 0:
         return {"kor": 0.0, "latin_num": 0.0, "special": 1.0}
 
-    kor_count = sum(1 for ch in line if "가" <= ch <= "힣")
-    latin_num_count = sum(1 for ch in line if ch.isascii() and ch.isalnum())
-    special_count = sum(1 for ch in line if not ch.isspace() and not (("가" <= ch <= "힣") or (ch.isascii() and ch.isalnum())))
+    if total < CHAR_RATIO_NUMPY_MIN_LEN:
+        kor_count = latin_num_count = special_count = 0
+        for ch in line:
+            if "가" <= ch <= "힣":
+                kor_count += 1
+            elif ch.isascii() and ch.isalnum():
+                latin_num_count += 1
+            elif not ch.isspace():
+                special_count += 1
+    else:
+        codes = np.frombuffer(line.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        folded = codes | 0x20
+        kor_count = int(np.count_nonzero((codes >= 0xAC00) & (codes <= 0xD7A3)))
+        latin_num_count = int(
+            np.count_nonzero(((codes >= 0x30) & (codes <= 0x39)) | ((folded >= 0x61) & (folded <= 0x7A)))
+        )
+        space_count = int(np.count_nonzero(np.isin(codes, _WHITESPACE_CODEPOINTS)))
+        special_count = total - kor_count - latin_num_count - space_count
     return {
         "kor": kor_count / total,
         "latin_num": latin_num_count / total,
@@ -181,230 +469,447 @@ def _filter_subtitle_lines(raw_lines, korean_only=False, include_english=False):
     return cleaned
 
 
-def _dedupe_lines(lines):
-    results = []
-    seen = set()
-    for line in lines:
+def _bigrams(text: str):
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def _similar_lengths(length: int, threshold: float):
+    # ratio <= 2 * min(la, lb) / (la + lb) 이므로 길이 차이가 큰 문장은 비교할 필요가 없다.
+    low = math.floor(length * threshold / (2 - threshold))
+    high = math.ceil(length * (2 - threshold) / threshold)
+    return range(max(low, 2), high + 1)
+
+
+class _LineDeduper:
+    # 유사도 임계값 이상인 서로 다른 두 문장은 반드시 bigram을 하나 이상 공유하므로
+    # bigram을 공유하고 길이가 비슷한 기존 문장만 비교해도 결과가 같다.
+    def __init__(self):
+        self.lines = []
+        self._seen = set()
+        self._bigram_index = {}
+
+    def add(self, line: str):
         normalized = _normalize_text(line)
-        if not normalized:
-            continue
-        if normalized in seen:
-            continue
-        if any(SequenceMatcher(None, normalized, existing).ratio() >= 0.88 for existing in results):
-            continue
-        results.append(normalized)
-        seen.add(normalized)
-    return results
+        if not normalized or normalized in self._seen:
+            return None
+        bigrams = _bigrams(normalized)
+        candidates = set()
+        for length in _similar_lengths(len(normalized), DEDUPE_SIMILARITY_THRESHOLD):
+            for gram in bigrams:
+                candidates.update(self._bigram_index.get((gram, length), ()))
+        if any(
+            fuzz.ratio(normalized, self.lines[pos], score_cutoff=DEDUPE_SIMILARITY_THRESHOLD * 100)
+            for pos in sorted(candidates)
+        ):
+            return None
+        for gram in bigrams:
+            self._bigram_index.setdefault((gram, len(normalized)), []).append(len(self.lines))
+        self.lines.append(normalized)
+        self._seen.add(normalized)
+        return normalized
+
+
+def _tesseract_list_path(path: str):
+    # Tesseract는 목록의 경로를 작업 디렉터리 기준으로 읽으므로, 가능하면 상대 경로(ASCII)로 적는다.
+    try:
+        return os.path.relpath(path)
+    except ValueError:
+        return os.path.abspath(path)
+
+
+def _ocr_batch(procs, lang: str, psm_mode: int, work_dir: str):
+    with tempfile.TemporaryDirectory(prefix="ocr_batch_", dir=work_dir) as batch_dir:
+        page_paths = []
+        for page, proc in enumerate(procs):
+            page_path = os.path.join(batch_dir, f"{page:06d}.png")
+            cv2.imwrite(page_path, proc, _OCR_PAGE_PNG_PARAMS)
+            page_paths.append(page_path)
+        list_path = os.path.join(batch_dir, "list.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(map(_tesseract_list_path, page_paths)) + "\n")
+
+        text = pytesseract.image_to_string(list_path, lang=lang, config=f"--oem 1 --psm {psm_mode}")
+
+    pages = text.split("\f")
+    pages += [""] * (len(procs) - len(pages))
+    return [[ln for ln in page.splitlines() if ln and ln.strip()] for page in pages[: len(procs)]]
 
 
-def _ocr_worker(job_id: str):
+def _ocr_with_api(api, procs):
+    frame_lines = []
+    for proc in procs:
+        roi_h, roi_w = proc.shape[:2]
+        api.SetImageBytes(proc.tobytes(), roi_w, roi_h, 1, roi_w)
+        text = api.GetUTF8Text()
+        frame_lines.append([ln for ln in text.splitlines() if ln and ln.strip()])
+    return frame_lines
+
+
+def _recognize_batch(procs, lang: str, psm_mode: int, api_pool, work_dir: str):
+    if api_pool is None:
+        return _ocr_batch(procs, lang, psm_mode, work_dir)
+    api = api_pool.get()
+    try:
+        return _ocr_with_api(api, procs)
+    finally:
+        api_pool.put(api)
+
+
+def _ocr_worker(app, job_id: str, cancel_event):
     cap = None
+    api_pool = None
+    executor = None
+    preprocess_pool = None
+    reader = None
+    reader_stop = threading.Event()
+    result_file = None
+    partial_path = None
+    job = None
     try:
-        with JOBS_LOCK:
-            job = JOBS.get(job_id)
-            if not job:
-                return
-            job["status"] = "processing"
-            job["result_text"] = ""
-            job["error"] = ""
+        job = JOBS.get(job_id)
+        if not job:
+            return
+        with job.lock:
+            job.status = "processing"
+            job.result_text = ""
+            job.error = ""
 
-        video_path = job["video_path"]
-        roi = job.get("roi")
+        video_path = job.video_path
+        roi = job.roi
         if not roi:
-            with JOBS_LOCK:
-                JOBS[job_id]["status"] = "error"
-                JOBS[job_id]["error"] = "ROI가 설정되지 않았습니다."
+            with job.lock:
+                job.status = "error"
+                job.error = "ROI가 설정되지 않았습니다."
             return
 
-        cap = cv2.VideoCapture(video_path)
+        cap = _open_video(video_path)
         if not cap.isOpened():
-            with JOBS_LOCK:
-                JOBS[job_id]["status"] = "error"
-                JOBS[job_id]["error"] = "영상 파일을 열 수 없습니다."
+            with job.lock:
+                job.status = "error"
+                job.error = "영상 파일을 열 수 없습니다."
             return
 
-        fps = cap.get(cv2.CAP_PROP_FPS) or 0
-        total_frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
-        duration = int(total_frames / fps) if fps > 0 else 0
-        if job.get("limit_to_60", True):
-            duration = min(duration, OCR_MAX_SECONDS_DEFAULT)
-
-        sample_seconds = list(range(0, max(duration, 1) + 1, OCR_INTERVAL_SECONDS))
-        if not sample_seconds:
-            sample_seconds = [0]
-        total_samples = len(sample_seconds)
-
-        with JOBS_LOCK:
-            JOBS[job_id]["progress_current"] = 0
-            JOBS[job_id]["progress_total"] = total_samples
-
-        x, y, w, h = roi["x"], roi["y"], roi["w"], roi["h"]
-        raw_lines = []
-        lines = []
-
-        for idx, sec in enumerate(sample_seconds, start=1):
-            print(f"[OCR][{job_id}] frame {idx}/{total_samples} at {sec}s")
-            with JOBS_LOCK:
-                current_job = JOBS.get(job_id)
-                if not current_job:
-                    return
-                if current_job.get("cancel_requested"):
-                    current_job["status"] = "cancelled"
+        fps = job.fps
+        duration = int(job.duration)
+        max_seconds = None
+        if job.limit_to_60:
+            max_seconds = OCR_MAX_SECONDS_DEFAULT
+            duration = min(duration, max_seconds)
+        total_samples = duration // OCR_INTERVAL_SECONDS + 1
+
+        with job.lock:
+            job.progress_current = 0
+            job.progress_total = total_samples
+
+        psm_mode = int(job.psm_mode)
+        if psm_mode not in (6, 7):
+            psm_mode = 6
+        include_english = bool(job.include_english)
+        korean_only = bool(job.korean_only)
+        lang = "kor+eng" if include_english else "kor"
+
+        if PyTessBaseAPI is not None:
+            api_pool = queue.Queue()
+            for _ in range(OCR_WORKERS):
+                api_pool.put(
+                    PyTessBaseAPI(
+                        lang=lang,
+                        psm=PSM.SINGLE_BLOCK if psm_mode == 6 else PSM.SINGLE_LINE,
+                        oem=OEM.LSTM_ONLY,
+                    )
+                )
+        executor = ThreadPoolExecutor(max_workers=OCR_WORKERS)
+        preprocess_pool = ThreadPoolExecutor(max_workers=PREPROCESS_WORKERS)
+
+        raw_count = 0
+        deduper = _LineDeduper()
+        next_frame = 1
+        last_frame = (0, [])
+        batch = []
+        batch_size = min(OCR_BATCH_SIZE, -(-total_samples // OCR_WORKERS))
+        pending = {}
+        frame_results = {}
+        duplicate_of = {}
+        prev_proc = None
+        prev_idx = None
+        preprocessing = collections.deque()
+
+        def collect_results(return_when, timeout=None):
+            # 배치 OCR을 기다리는 동안에도 취소 요청을 확인한다.
+            while True:
+                if cancel_event.is_set():
+                    raise _OcrCancelled()
+                done, not_done = wait(
+                    pending,
+                    timeout=OCR_CANCEL_POLL_SECONDS if timeout is None else timeout,
+                    return_when=return_when,
+                )
+                for future in done:
+                    frame_indices = pending.pop(future)
+                    frame_results.update(zip(frame_indices, future.result()))
+                write_ready_lines()
+                if timeout is not None or not not_done or (return_when == FIRST_COMPLETED and done):
                     return
-                current_job["progress_current"] = idx
 
-            cap.set(cv2.CAP_PROP_POS_MSEC, sec * 1000)
-            ok, frame = cap.read()
-            if not ok:
-                print(f"[OCR][{job_id}] frame read failed at {sec}s")
-                continue
-
-            h_frame, w_frame = frame.shape[:2]
-            x2, y2 = min(x + w, w_frame), min(y + h, h_frame)
-            x1, y1 = max(0, x), max(0, y)
-            if x2 <= x1 or y2 <= y1:
-                print(f"[OCR][{job_id}] invalid ROI bounds at frame {idx}")
-                continue
+        def write_ready_lines():
+            # 앞쪽부터 결과가 모두 모인 프레임까지만 순서대로 중복 제거 후 파일에 이어 쓴다.
+            nonlocal next_frame, raw_count, last_frame
+            wrote = False
+            while True:
+                if next_frame in frame_results:
+                    frame_ocr = frame_results.pop(next_frame)
+                    if frame_ocr is None:
+                        next_frame += 1
+                        continue
+                    frame_lines = [line for line in map(_normalize_text, frame_ocr) if line]
+                    filtered_lines = _filter_subtitle_lines(
+                        frame_lines,
+                        korean_only=korean_only,
+                        include_english=include_english,
+                    )
+                    last_frame = (len(frame_lines), filtered_lines)
+                elif next_frame in duplicate_of:
+                    del duplicate_of[next_frame]
+                else:
+                    break
+                frame_line_count, filtered_lines = last_frame
+                raw_count += frame_line_count
+                if filtered_lines:
+                    print(f"[OCR][{job_id}] detected text on frame {next_frame}")
+                    for line in filtered_lines:
+                        accepted = deduper.add(line)
+                        if accepted is not None:
+                            result_file.write(f"\n{accepted}" if len(deduper.lines) > 1 else accepted)
+                            wrote = True
+                next_frame += 1
+            job.progress_current = next_frame - 1
+            if wrote:
+                result_file.flush()
+
+        def flush_batch():
+            if not batch:
+                return
+            future = executor.submit(
+                _recognize_batch,
+                [proc for _, proc in batch],
+                lang,
+                psm_mode,
+                api_pool,
+                os.path.join(app.config["UPLOAD_FOLDER"], job_id),
+            )
+            pending[future] = [frame_idx for frame_idx, _ in batch]
+            batch.clear()
+            if len(pending) >= OCR_WORKERS * 2:
+                collect_results(FIRST_COMPLETED)
 
-            roi_img = frame[y1:y2, x1:x2]
-            binary_before_filter, proc = _preprocess_subtitle_roi(roi_img)
+        def handle_preprocessed(frame_idx, future):
+            nonlocal prev_proc, prev_idx
+            binary_before_filter, proc = future.result()
 
-            if app.debug:
+            if binary_before_filter is not None and cv2.countNonZero(binary_before_filter):
                 before_name = "debug_preprocessed_roi_before_filter.jpg"
                 after_name = "debug_preprocessed_roi_after_filter.jpg"
                 before_path = os.path.join(app.config["UPLOAD_FOLDER"], job_id, before_name)
                 after_path = os.path.join(app.config["UPLOAD_FOLDER"], job_id, after_name)
-                cv2.imwrite(before_path, binary_before_filter)
-                cv2.imwrite(after_path, proc)
-                with JOBS_LOCK:
-                    if job_id in JOBS:
-                        JOBS[job_id]["debug_preprocessed_roi_before"] = f"uploads/{job_id}/{before_name}"
-                        JOBS[job_id]["debug_preprocessed_roi_after"] = f"uploads/{job_id}/{after_name}"
-
-            psm_mode = int(job.get("psm_mode", 6))
-            if psm_mode not in (6, 7):
-                psm_mode = 6
-            include_english = bool(job.get("include_english", False))
-            lang = "kor+eng" if include_english else "kor"
-            text = pytesseract.image_to_string(proc, lang=lang, config=f"--oem 1 --psm {psm_mode}")
-            frame_lines = [ln for ln in text.splitlines() if ln and ln.strip()]
-            raw_lines.extend(_normalize_text(ln) for ln in frame_lines if _normalize_text(ln))
-            filtered_lines = _filter_subtitle_lines(
-                frame_lines,
-                korean_only=bool(job.get("korean_only", False)),
-                include_english=include_english,
-            )
-            if filtered_lines:
-                lines.extend(filtered_lines)
-                print(f"[OCR][{job_id}] detected text on frame {idx}")
-
-        raw_count = len(raw_lines)
-        deduped = _dedupe_lines(lines)
-        cleaned_count = len(deduped)
-        result_text = "\n".join(deduped)
+                cv2.imwrite(before_path, binary_before_filter, _DEBUG_JPEG_PARAMS)
+                cv2.imwrite(after_path, proc, _DEBUG_JPEG_PARAMS)
+                with job.lock:
+                    job.debug_preprocessed_roi_before = f"uploads/{job_id}/{before_name}"
+                    job.debug_preprocessed_roi_after = f"uploads/{job_id}/{after_name}"
+
+            proc = _scale_for_ocr(proc)
+            if _is_same_mask(proc, prev_proc):
+                duplicate_of[frame_idx] = prev_idx
+                return
+            prev_proc, prev_idx = proc, frame_idx
+
+            batch.append((frame_idx, proc))
+            if len(batch) >= batch_size:
+                flush_batch()
+
+        # 이전 결과는 이번 작업이 성공할 때까지 그대로 내려받을 수 있게 둔다.
         result_path = os.path.join(app.config["UPLOAD_FOLDER"], job_id, "result.txt")
-        with open(result_path, "w", encoding="utf-8") as f:
-            f.write(result_text)
-
-        with JOBS_LOCK:
-            JOBS[job_id]["status"] = "done"
-            JOBS[job_id]["result_text"] = result_text
-            JOBS[job_id]["result_file"] = result_path
-            JOBS[job_id]["raw_line_count"] = raw_count
-            JOBS[job_id]["cleaned_line_count"] = cleaned_count
+        partial_path = f"{result_path}.part"
+        result_file = open(partial_path, "w", encoding="utf-8", buffering=1 << 16)
+
+        read_q = queue.Queue(maxsize=OCR_READ_QUEUE_SIZE)
+        reader = threading.Thread(
+            target=_read_sample_rois,
+            args=(job_id, cap, fps, max_seconds, roi, read_q, reader_stop),
+            daemon=True,
+        )
+        reader.start()
+
+        for item in iter(read_q.get, None):
+            if isinstance(item, Exception):
+                raise item
+            idx, sec, roi_img = item
+            print(f"[OCR][{job_id}] frame {idx}/{total_samples} at {sec}s")
+            if cancel_event.is_set():
+                with job.lock:
+                    job.status = "cancelled"
+                return
+            # 진행률은 이 워커만 쓰므로 잠금 없이 갱신한다. current는 OCR 결과를 소비할 때 올린다.
+            if idx > job.progress_total:
+                job.progress_total = idx
+
+            if roi_img is None:
+                frame_results[idx] = None
+                continue
+
+            preprocessing.append((idx, preprocess_pool.submit(_preprocess_sample, roi_img, app.debug)))
+            while len(preprocessing) > PREPROCESS_WORKERS * 2:
+                handle_preprocessed(*preprocessing.popleft())
+            if pending:
+                collect_results(FIRST_COMPLETED, timeout=0)
+
+        while preprocessing:
+            handle_preprocessed(*preprocessing.popleft())
+        flush_batch()
+        collect_results(ALL_COMPLETED)
+        result_file.close()
+        cleaned_count = len(deduper.lines)
+        result_text = "\n".join(deduper.lines)
+
+        with job.lock:
+            if cancel_event.is_set():
+                job.status = "cancelled"
+                return
+            os.replace(partial_path, result_path)
+            job.status = "done"
+            job.result_text = result_text
+            job.result_file = result_path
+            job.raw_line_count = raw_count
+            job.cleaned_line_count = cleaned_count
+    except _OcrCancelled:
+        print(f"[OCR][{job_id}] cancelled while waiting for OCR batches")
+        executor.shutdown(wait=False, cancel_futures=True)
+        with job.lock:
+            job.status = "cancelled"
     except Exception as exc:
         print(f"[OCR][{job_id}] worker exception: {exc}")
         print(traceback.format_exc())
-        with JOBS_LOCK:
-            if job_id in JOBS:
-                JOBS[job_id]["status"] = "error"
-                JOBS[job_id]["error"] = str(exc)
+        if job is not None:
+            with job.lock:
+                job.status = "error"
+                job.error = str(exc)
     finally:
+        reader_stop.set()
+        if reader is not None:
+            reader.join()
+        if preprocess_pool is not None:
+            preprocess_pool.shutdown(wait=True, cancel_futures=True)
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
         if cap is not None:
             cap.release()
+        if result_file is not None:
+            result_file.close()
+        if partial_path is not None and os.path.exists(partial_path):
+            os.remove(partial_path)
+        if api_pool is not None:
+            while not api_pool.empty():
+                api_pool.get().End()
 
 
-@app.route("/uploads/<path:filename>")
+@bp.route("/uploads/<path:filename>")
 def uploaded_file(filename):
-    return send_from_directory(app.config["UPLOAD_FOLDER"], filename)
+    accel_prefix = current_app.config["UPLOADS_ACCEL_REDIRECT"]
+    if not accel_prefix:
+        return send_from_directory(current_app.config["UPLOAD_FOLDER"], filename)
+    if safe_join(current_app.config["UPLOAD_FOLDER"], filename) is None:
+        abort(404)
+    response = current_app.response_class(
+        mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    )
+    response.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{quote(filename)}"
+    return response
+
+
+@bp.route("/thumb/<job_id>/<int:idx>")
+def thumbnail(job_id, idx):
+    job = JOBS.get(job_id)
+    if not job or idx >= len(job.thumbnails):
+        abort(404)
+    return current_app.response_class(job.thumbnails[idx]["jpeg"], mimetype="image/jpeg")
 
 
-@app.route("/", methods=["GET"])
+@bp.route("/", methods=["GET"])
 def index():
     job_id = request.args.get("job")
     job = JOBS.get(job_id) if job_id else None
     return render_template("index.html", job=job, job_id=job_id)
 
 
-@app.route("/upload", methods=["POST"])
+@bp.route("/upload", methods=["POST"])
 def upload():
     file = request.files.get("video")
     if not file or file.filename == "":
-        return redirect(url_for("index"))
+        return redirect(url_for(".index"))
 
     job_id = str(uuid.uuid4())
-    job_dir = os.path.join(app.config["UPLOAD_FOLDER"], job_id)
+    job_dir = os.path.join(current_app.config["UPLOAD_FOLDER"], job_id)
     os.makedirs(job_dir, exist_ok=True)
 
     video_path = os.path.join(job_dir, "input.mp4")
-    file.save(video_path)
-
-    thumbs = _build_thumbnail_list(job_id, video_path)
-    JOBS[job_id] = {
-        "video_path": video_path,
-        "thumbnails": thumbs,
-        "selected_timestamp": None,
-        "selected_frame": None,
-        "roi": None,
-        "status": "uploaded",
-        "result_text": "",
-        "cancel_requested": False,
-        "limit_to_60": True,
-        "progress_current": 0,
-        "progress_total": 0,
-        "error": "",
-        "debug_preprocessed_roi_before": None,
-        "debug_preprocessed_roi_after": None,
-        "psm_mode": 6,
-        "korean_only": False,
-        "include_english": False,
-        "raw_line_count": 0,
-        "cleaned_line_count": 0,
-    }
-    return redirect(url_for("index", job=job_id))
+    upload_path = getattr(file.stream, "name", None)
+    if isinstance(upload_path, str) and os.path.isfile(upload_path):
+        file.stream.close()
+        os.replace(upload_path, video_path)
+    else:
+        file.save(video_path)
+
+    cap = _open_video(video_path)
+    try:
+        fps = (cap.get(cv2.CAP_PROP_FPS) or 0) if cap.isOpened() else 0
+        total_frames = (cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0) if cap.isOpened() else 0
+        duration = total_frames / fps if fps > 0 else 0
+        thumbs = _build_thumbnail_list(cap, fps, duration)
+    finally:
+        cap.release()
+
+    job = Job(
+        video_path=video_path,
+        fps=fps,
+        total_frames=total_frames,
+        duration=duration,
+        thumbnails=thumbs,
+    )
+    JOBS[job_id] = job
+    return redirect(url_for(".index", job=job_id))
 
 
-@app.route("/select_frame", methods=["POST"])
+@bp.route("/select_frame", methods=["POST"])
 def select_frame():
     job_id = request.form.get("job_id")
     timestamp = float(request.form.get("timestamp", 0))
     job = JOBS.get(job_id)
     if not job:
-        return redirect(url_for("index"))
+        return redirect(url_for(".index"))
 
-    frame = _extract_frame(job["video_path"], timestamp)
+    frame = _extract_frame(job.video_path, timestamp)
     if frame is None:
-        return redirect(url_for("index", job=job_id))
+        return redirect(url_for(".index", job=job_id))
 
     frame_name = "selected_frame.jpg"
-    frame_path = os.path.join(app.config["UPLOAD_FOLDER"], job_id, frame_name)
+    frame_path = os.path.join(current_app.config["UPLOAD_FOLDER"], job_id, frame_name)
     cv2.imwrite(frame_path, frame)
 
-    job["selected_timestamp"] = timestamp
-    job["selected_frame"] = f"uploads/{job_id}/{frame_name}"
-    job["roi"] = None
-    job["status"] = "frame_selected"
-    job["error"] = ""
+    job.selected_timestamp = timestamp
+    job.selected_frame = f"uploads/{job_id}/{frame_name}"
+    job.roi = None
+    job.status = "frame_selected"
+    job.error = ""
 
-    return redirect(url_for("index", job=job_id))
+    return redirect(url_for(".index", job=job_id))
 
 
-@app.route("/set_roi", methods=["POST"])
+@bp.route("/set_roi", methods=["POST"])
 def set_roi():
     job_id = request.form.get("job_id")
     job = JOBS.get(job_id)
     if not job:
-        return redirect(url_for("index"))
+        return redirect(url_for(".index"))
 
     def _to_int_or_zero(value):
         if value in (None, ""):
@@ -420,64 +925,83 @@ def set_roi():
     h = _to_int_or_zero(request.form.get("h"))
 
     if w <= 0 or h <= 0:
-        job["error"] = "ROI를 드래그로 지정하세요."
-        return redirect(url_for("index", job=job_id))
+        job.error = "ROI를 드래그로 지정하세요."
+        return redirect(url_for(".index", job=job_id))
 
-    job["roi"] = {"x": x, "y": y, "w": w, "h": h}
-    job["status"] = "roi_set"
-    job["error"] = ""
-    return redirect(url_for("index", job=job_id))
+    job.roi = {"x": x, "y": y, "w": w, "h": h}
+    job.status = "roi_set"
+    job.error = ""
+    return redirect(url_for(".index", job=job_id))
 
 
-@app.route("/start_ocr", methods=["POST"])
+@bp.route("/start_ocr", methods=["POST"])
 def start_ocr():
     job_id = request.form.get("job_id")
     job = JOBS.get(job_id)
     if not job:
-        return redirect(url_for("index"))
+        return redirect(url_for(".index"))
 
-    job["cancel_requested"] = False
-    job["limit_to_60"] = request.form.get("limit_to_60") == "on"
+    cancel_event = threading.Event()
+    job.cancel_event = cancel_event
+    job.limit_to_60 = request.form.get("limit_to_60") == "on"
     psm_mode = request.form.get("psm_mode", "6")
     try:
         parsed_psm = int(psm_mode)
     except ValueError:
         parsed_psm = 6
-    job["psm_mode"] = parsed_psm if parsed_psm in (6, 7) else 6
-    job["korean_only"] = request.form.get("korean_only") == "on"
-    job["include_english"] = request.form.get("include_english") == "on"
-    job["progress_current"] = 0
-    job["progress_total"] = 0
-    job["raw_line_count"] = 0
-    job["cleaned_line_count"] = 0
-    job["error"] = ""
+    job.psm_mode = parsed_psm if parsed_psm in (6, 7) else 6
+    job.korean_only = request.form.get("korean_only") == "on"
+    job.include_english = request.form.get("include_english") == "on"
+    job.progress_current = 0
+    job.progress_total = 0
+    job.raw_line_count = 0
+    job.cleaned_line_count = 0
+    job.error = ""
     print(f"[OCR][{job_id}] starting background OCR thread")
-    threading.Thread(target=_ocr_worker, args=(job_id,), daemon=True).start()
-    return redirect(url_for("index", job=job_id))
+    threading.Thread(
+        target=_ocr_worker,
+        args=(current_app._get_current_object(), job_id, cancel_event),
+        daemon=True,
+    ).start()
+    return redirect(url_for(".index", job=job_id))
 
 
-@app.route("/reset_roi", methods=["POST"])
+@bp.route("/reset_roi", methods=["POST"])
 def reset_roi():
     job_id = request.form.get("job_id")
     job = JOBS.get(job_id)
     if not job:
-        return redirect(url_for("index"))
+        return redirect(url_for(".index"))
 
-    job["cancel_requested"] = True
-    job["roi"] = None
-    job["status"] = "frame_selected" if job.get("selected_frame") else "uploaded"
-    job["error"] = ""
-    return redirect(url_for("index", job=job_id))
+    job.cancel_event.set()
+    job.roi = None
+    job.status = "frame_selected" if job.selected_frame else "uploaded"
+    job.error = ""
+    return redirect(url_for(".index", job=job_id))
 
 
-@app.route("/download/<job_id>")
+@bp.route("/download/<job_id>")
 def download(job_id):
     job = JOBS.get(job_id)
-    if not job or not job.get("result_file"):
-        return redirect(url_for("index", job=job_id))
-    return send_file(job["result_file"], as_attachment=True, download_name="ocr_result.txt")
+    if not job or not job.result_file:
+        return redirect(url_for(".index", job=job_id))
+    return send_file(job.result_file, as_attachment=True, download_name="ocr_result.txt")
+
+
+def create_app():
+    app = Flask(__name__)
+    app.request_class = _UploadRequest
+    app.config["UPLOAD_FOLDER"] = "uploads"
+    # /uploads 로 공개되지 않도록 업로드 폴더 밖(같은 파일시스템)에 둔다.
+    app.config["INCOMING_FOLDER"] = "uploads_incoming"
+    app.config["MAX_CONTENT_LENGTH"] = 1024 * 1024 * 1024  # 1GB
+    # nginx/Apache 뒤에서 실행할 때 업로드 파일 전송을 프런트 서버에 맡긴다.
+    app.config["USE_X_SENDFILE"] = os.environ.get("USE_X_SENDFILE") == "1"
+    app.config["UPLOADS_ACCEL_REDIRECT"] = os.environ.get("UPLOADS_ACCEL_REDIRECT", "")
+    app.register_blueprint(bp)
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    return app
 
 
 if __name__ == "__main__":
-    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    create_app().run(debug=os.environ.get("FLASK_DEBUG") == "1", host="0.0.0.0", port=5000)
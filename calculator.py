@@ -2,19 +2,19 @@
 
 """간단한 사칙연산 계산기 프로그램."""
 
+from operator import add, mul, sub, truediv
+
+
+_OPS = {"+": add, "-": sub, "*": mul, "/": truediv}
+
 
 def calculate(num1: float, operator: str, num2: float) -> float:
-    if operator == "+":
-        return num1 + num2
-    if operator == "-":
-        return num1 - num2
-    if operator == "*":
-        return num1 * num2
-    if operator == "/":
-        if num2 == 0:
-            raise ZeroDivisionError("0으로 나눌 수 없습니다.")
-        return num1 / num2
-    raise ValueError("지원하지 않는 연산자입니다. (+, -, *, / 만 가능)")
+    op = _OPS.get(operator)
+    if op is None:
+        raise ValueError("지원하지 않는 연산자입니다. (+, -, *, / 만 가능)")
+    if op is truediv and num2 == 0:
+        raise ZeroDivisionError("0으로 나눌 수 없습니다.")
+    return op(num1, num2)
 
 
 def main() -> None:
@@ -0,0 +1,7 @@
+# 작업 상태(JOBS)와 OCR 스레드가 프로세스 메모리에 있으므로 워커는 1개로 두고 스레드로 동시 처리한다.
+# 같은 이유로 max_requests 같은 워커 재시작 옵션은 쓰지 않는다.
+bind = "0.0.0.0:5000"
+workers = 1
+worker_class = "gthread"
+threads = 8
+wsgi_app = "app:create_app()"